@@ -1,14 +1,19 @@
 """This module contains a linting functions for tool tests."""
 
 from typing import (
+    Any,
+    Callable,
+    Dict,
     Iterator,
     List,
+    Optional,
+    Set,
     Tuple,
     TYPE_CHECKING,
 )
 
 from galaxy.tool_util.lint import Linter
-from galaxy.util import asbool
+from galaxy.util import truthy
 from ._util import is_datasource
 
 if TYPE_CHECKING:
@@ -18,17 +23,22 @@ if TYPE_CHECKING:
 
 lint_tool_types = ["default", "data_source", "manage_data"]
 
+_ASSERT_TAGS = ("assert_contents", "assert_stdout", "assert_stderr", "assert_command")
+# assertions checked by the linters of this module
+_LINTED_ASSERTION_TAGS = ("has_n_lines", "has_n_columns", "has_size")
+_HAS_N_QUANT_ATTRIBS = frozenset(("n", "min", "max"))
+_HAS_SIZE_QUANT_ATTRIBS = frozenset(("value", "size", "min", "max"))
+_TEST_EXPECTATION_ATTRIBS = frozenset(("expect_failure", "expect_exit_code", "expect_num_outputs"))
+
 
 class TestsMissing(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        tests = tool_xml.findall("./tests/test")
-        root = tool_xml.find("./tests")
-        if root is None:
-            root = tool_xml.getroot()
+        tests = _get_tests(tool_source, tool_xml)
+        root = _get_tests_node(tool_source, tool_xml)
         if len(tests) == 0 and not is_datasource(tool_xml):
             lint_ctx.warn("No tests found, most tools should define test cases.", linter=cls.name(), node=root)
 
@@ -37,12 +47,10 @@ class TestsMissingDatasource(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        tests = tool_xml.findall("./tests/test")
-        root = tool_xml.find("./tests")
-        if root is None:
-            root = tool_xml.getroot()
+        tests = _get_tests(tool_source, tool_xml)
+        root = _get_tests_node(tool_source, tool_xml)
         if len(tests) == 0 and is_datasource(tool_xml):
             lint_ctx.info("No tests found, that should be OK for data_sources.", linter=cls.name(), node=root)
 
@@ -51,13 +59,18 @@ class TestsAssertsMultiple(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
             return
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
             # TODO same would be nice also for assert_contents
             for ta in ("assert_stdout", "assert_stderr", "assert_command"):
-                if len(test.findall(ta)) > 1:
+                # stop after the second match
+                ta_iter = test.iterfind(ta)
+                next(ta_iter, None)
+                if next(ta_iter, None) is not None:
                     lint_ctx.error(
                         f"Test {test_idx}: More than one {ta} found. Only the first is considered.",
                         linter=cls.name(),
@@ -69,19 +82,15 @@ class TestsAssertsHasNQuant(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        tests = tool_xml.findall("./tests/test")
-        for test_idx, test in enumerate(tests, start=1):
-            for a in test.xpath(
-                ".//*[self::assert_contents or self::assert_stdout or self::assert_stderr or self::assert_command]//*"
-            ):
-                if a.tag not in ["has_n_lines", "has_n_columns"]:
-                    continue
-                if not (set(a.attrib) & {"n", "min", "max"}):
-                    lint_ctx.error(
-                        f"Test {test_idx}: '{a.tag}' needs to specify 'n', 'min', or 'max'", linter=cls.name(), node=a
-                    )
+        for test_idx, a in _get_test_asserts(tool_source, tool_xml):
+            if a.tag not in ["has_n_lines", "has_n_columns"]:
+                continue
+            if _HAS_N_QUANT_ATTRIBS.isdisjoint(a.attrib):
+                lint_ctx.error(
+                    f"Test {test_idx}: '{a.tag}' needs to specify 'n', 'min', or 'max'", linter=cls.name(), node=a
+                )
 
 
 class TestsAssertsHasSizeQuant(Linter):
@@ -92,21 +101,17 @@ class TestsAssertsHasSizeQuant(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        tests = tool_xml.findall("./tests/test")
-        for test_idx, test in enumerate(tests, start=1):
-            for a in test.xpath(
-                ".//*[self::assert_contents or self::assert_stdout or self::assert_stderr or self::assert_command]//*"
-            ):
-                if a.tag != "has_size":
-                    continue
-                if len(set(a.attrib) & {"value", "size", "min", "max"}) == 0:
-                    lint_ctx.error(
-                        f"Test {test_idx}: '{a.tag}' needs to specify 'size', 'min', or 'max'",
-                        linter=cls.name(),
-                        node=a,
-                    )
+        for test_idx, a in _get_test_asserts(tool_source, tool_xml):
+            if a.tag != "has_size":
+                continue
+            if _HAS_SIZE_QUANT_ATTRIBS.isdisjoint(a.attrib):
+                lint_ctx.error(
+                    f"Test {test_idx}: '{a.tag}' needs to specify 'size', 'min', or 'max'",
+                    linter=cls.name(),
+                    node=a,
+                )
 
 
 class TestsAssertsHasSizeOrValueQuant(Linter):
@@ -117,39 +122,37 @@ class TestsAssertsHasSizeOrValueQuant(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        tests = tool_xml.findall("./tests/test")
-        for test_idx, test in enumerate(tests, start=1):
-            for a in test.xpath(
-                ".//*[self::assert_contents or self::assert_stdout or self::assert_stderr or self::assert_command]//*"
-            ):
-                if a.tag != "has_size":
-                    continue
-                if "value" in a.attrib and "size" in a.attrib:
-                    lint_ctx.error(
-                        f"Test {test_idx}: '{a.tag}' must not specify 'value' and 'size'",
-                        linter=cls.name(),
-                        node=a,
-                    )
+        for test_idx, a in _get_test_asserts(tool_source, tool_xml):
+            if a.tag != "has_size":
+                continue
+            if "value" in a.attrib and "size" in a.attrib:
+                lint_ctx.error(
+                    f"Test {test_idx}: '{a.tag}' must not specify 'value' and 'size'",
+                    linter=cls.name(),
+                    node=a,
+                )
 
 
 class TestsExpectNumOutputs(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
+            return
+        # check if expect_num_outputs is set if there are outputs with filters
+        # (except for tests with expect_failure .. which can't have test outputs)
+        has_no_filter = (
+            tool_xml.find("./outputs/data/filter") is None and tool_xml.find("./outputs/collection/filter") is None
+        )
+        if has_no_filter:
             return
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
-            # check if expect_num_outputs is set if there are outputs with filters
-            # (except for tests with expect_failure .. which can't have test outputs)
-            has_no_filter = (
-                tool_xml.find("./outputs/data/filter") is None and tool_xml.find("./outputs/collection/filter") is None
-            )
-            if not (
-                has_no_filter or "expect_num_outputs" in test.attrib or asbool(test.attrib.get("expect_failure", False))
-            ):
+            if not ("expect_num_outputs" in test.attrib or _expect_failure(test)):
                 lint_ctx.warn(
                     f"Test {test_idx}: should specify 'expect_num_outputs' if outputs have filters",
                     linter=cls.name(),
@@ -165,26 +168,27 @@ class TestsParamInInputs(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
             return
-        tests = tool_xml.findall("./tests/test")
+        input_names: Set[Optional[str]] = set()
+        input_arguments: Set[Optional[str]] = set()
+        for inparam in tool_xml.iterfind(".//inputs//param"):
+            input_names.add(inparam.get("name"))
+            input_arguments.add(inparam.get("argument"))
+        # test params with the same name are commonly used in many tests
+        found: Dict[str, bool] = {}
         for test_idx, test in enumerate(tests, start=1):
             for param in test.findall("param"):
-                name = param.attrib.get("name", None)
+                name = param.get("name")
                 if not name:
                     continue
                 name = name.split("|")[-1]
-                xpaths = [f"@name='{name}'", f"@argument='{name}'", f"@argument='-{name}'", f"@argument='--{name}'"]
-                if "_" in name:
-                    xpaths += [f"@argument='-{name.replace('_', '-')}'", f"@argument='--{name.replace('_', '-')}'"]
-                found = False
-                for xp in xpaths:
-                    inxpath = f".//inputs//param[{xp}]"
-                    inparam = tool_xml.findall(inxpath)
-                    if len(inparam) > 0:
-                        found = True
-                        break
-                if not found:
+                if name not in found:
+                    found[name] = _param_in_inputs(name, input_names, input_arguments)
+                if not found[name]:
                     lint_ctx.error(
                         f"Test {test_idx}: Test param {name} not found in the inputs", linter=cls.name(), node=param
                     )
@@ -194,13 +198,15 @@ class TestsOutputName(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
             return
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
             # note output_collections are covered by xsd, but output is not required to have one by xsd
             for output in test.findall("output"):
-                if not output.attrib.get("name", None):
+                if not output.get("name"):
                     lint_ctx.error(
                         f"Test {test_idx}: Found {output.tag} tag without a name defined.",
                         linter=cls.name(),
@@ -212,21 +218,20 @@ class TestsOutputDefined(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        output_data_or_collection = _collect_output_names(tool_xml)
-        tests = tool_xml.findall("./tests/test")
-        for test_idx, test in enumerate(tests, start=1):
-            for output in test.findall("output") + test.findall("output_collection"):
-                name = output.attrib.get("name", None)
-                if not name:
-                    continue
-                if name not in output_data_or_collection:
-                    lint_ctx.error(
-                        f"Test {test_idx}: Found {output.tag} tag with unknown name [{name}], valid names {list(output_data_or_collection)}",
-                        linter=cls.name(),
-                        node=output,
-                    )
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
+            return
+        output_data_or_collection = _get_output_names(tool_source, tool_xml)
+        valid_names = list(output_data_or_collection)
+        for test_idx, output, name in _get_test_outputs(tool_source, tool_xml):
+            if name not in output_data_or_collection:
+                lint_ctx.error(
+                    f"Test {test_idx}: Found {output.tag} tag with unknown name [{name}], valid names {valid_names}",
+                    linter=cls.name(),
+                    node=output,
+                )
 
 
 class TestsOutputCorresponding(Linter):
@@ -237,26 +242,26 @@ class TestsOutputCorresponding(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        output_data_or_collection = _collect_output_names(tool_xml)
-        tests = tool_xml.findall("./tests/test")
-        for test_idx, test in enumerate(tests, start=1):
-            for output in test.findall("output") + test.findall("output_collection"):
-                name = output.attrib.get("name", None)
-                if not name:
-                    continue
-                if name not in output_data_or_collection:
-                    continue
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
+            return
+        output_data_or_collection = _get_output_names(tool_source, tool_xml)
+        for test_idx, output, name in _get_test_outputs(tool_source, tool_xml):
+            if name not in output_data_or_collection:
+                continue
 
-                # - test/collection to outputs/output_collection
-                corresponding_output = output_data_or_collection[name]
-                if output.tag == "output" and corresponding_output.tag != "data":
-                    lint_ctx.error(
-                        f"Test {test_idx}: test output {name} does not correspond to a 'data' output, but a '{corresponding_output.tag}'",
-                        linter=cls.name(),
-                        node=output,
-                    )
+            # - test/collection to outputs/output_collection
+            corresponding_output = output_data_or_collection[name]
+            otag = output.tag
+            ctag = corresponding_output.tag
+            if otag == "output" and ctag != "data":
+                lint_ctx.error(
+                    f"Test {test_idx}: test output {name} does not correspond to a 'data' output, but a '{ctag}'",
+                    linter=cls.name(),
+                    node=output,
+                )
 
 
 class TestsOutputCollectionCorresponding(Linter):
@@ -267,26 +272,26 @@ class TestsOutputCollectionCorresponding(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        output_data_or_collection = _collect_output_names(tool_xml)
-        tests = tool_xml.findall("./tests/test")
-        for test_idx, test in enumerate(tests, start=1):
-            for output in test.findall("output") + test.findall("output_collection"):
-                name = output.attrib.get("name", None)
-                if not name:
-                    continue
-                if name not in output_data_or_collection:
-                    continue
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
+            return
+        output_data_or_collection = _get_output_names(tool_source, tool_xml)
+        for test_idx, output, name in _get_test_outputs(tool_source, tool_xml):
+            if name not in output_data_or_collection:
+                continue
 
-                # - test/collection to outputs/output_collection
-                corresponding_output = output_data_or_collection[name]
-                if output.tag == "output_collection" and corresponding_output.tag != "collection":
-                    lint_ctx.error(
-                        f"Test {test_idx}: test collection output '{name}' does not correspond to a 'output_collection' output, but a '{corresponding_output.tag}'",
-                        linter=cls.name(),
-                        node=output,
-                    )
+            # - test/collection to outputs/output_collection
+            corresponding_output = output_data_or_collection[name]
+            otag = output.tag
+            ctag = corresponding_output.tag
+            if otag == "output_collection" and ctag != "collection":
+                lint_ctx.error(
+                    f"Test {test_idx}: test collection output '{name}' does not correspond to a 'output_collection' output, but a '{ctag}'",
+                    linter=cls.name(),
+                    node=output,
+                )
 
 
 class TestsOutputCompareAttrib(Linter):
@@ -298,9 +303,11 @@ class TestsOutputCompareAttrib(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
             return
-        tests = tool_xml.findall("./tests/test")
         COMPARE_COMPATIBILITY = {
             "sort": ["diff", "re_match", "re_match_multiline"],
             "lines_diff": ["diff", "re_match", "contains"],
@@ -311,10 +318,11 @@ class TestsOutputCompareAttrib(Linter):
             "eps": ["image_diff"],
         }
         for test_idx, test in enumerate(tests, start=1):
-            for output in test.xpath(".//*[self::output or self::element or self::discovered_dataset]"):
-                compare = output.get("compare", "diff")
+            for output in test.iter("output", "element", "discovered_dataset"):
+                output_attrib = output.attrib
+                compare = output_attrib.get("compare", "diff")
                 for attrib in COMPARE_COMPATIBILITY:
-                    if attrib in output.attrib and compare not in COMPARE_COMPATIBILITY[attrib]:
+                    if attrib in output_attrib and compare not in COMPARE_COMPATIBILITY[attrib]:
                         lint_ctx.error(
                             f'Test {test_idx}: Attribute {attrib} is incompatible with compare="{compare}".',
                             linter=cls.name(),
@@ -331,24 +339,24 @@ class TestsOutputCheckDiscovered(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
+            return
+        discover_output_names = _get_discover_output_names(tool_source, tool_xml)
+        if not discover_output_names:
             return
-        output_data_or_collection = _collect_output_names(tool_xml)
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
             for output in test.findall("output"):
-                name = output.attrib.get("name", None)
-                if not name:
+                if "count" in output.attrib:
                     continue
-                if name not in output_data_or_collection:
+                name = output.get("name")
+                if not name:
                     continue
-
-                # - test/collection to outputs/output_collection
-                corresponding_output = output_data_or_collection[name]
-                discover_datasets = corresponding_output.find(".//discover_datasets")
-                if discover_datasets is None:
+                if name not in discover_output_names:
                     continue
-                if "count" not in output.attrib and output.find("./discovered_dataset") is None:
+                if output.find("./discovered_dataset") is None:
                     lint_ctx.error(
                         f"Test {test_idx}: test output '{name}' must have a 'count' attribute and/or 'discovered_dataset' children",
                         linter=cls.name(),
@@ -365,23 +373,24 @@ class TestsOutputCollectionCheckDiscovered(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
+            return
+        discover_output_names = _get_discover_output_names(tool_source, tool_xml)
+        if not discover_output_names:
             return
-        output_data_or_collection = _collect_output_names(tool_xml)
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
             for output in test.findall("output_collection"):
-                name = output.attrib.get("name", None)
-                if not name:
+                if "count" in output.attrib:
                     continue
-                if name not in output_data_or_collection:
+                name = output.get("name")
+                if not name:
                     continue
-                # - test/collection to outputs/output_collection
-                corresponding_output = output_data_or_collection[name]
-                discover_datasets = corresponding_output.find(".//discover_datasets")
-                if discover_datasets is None:
+                if name not in discover_output_names:
                     continue
-                if "count" not in output.attrib and output.find("./element") is None:
+                if output.find("./element") is None:
                     lint_ctx.error(
                         f"Test {test_idx}: test collection '{name}' must have a 'count' attribute or 'element' children",
                         linter=cls.name(),
@@ -395,31 +404,33 @@ class TestsOutputCollectionCheckDiscoveredNested(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
+            return
+        output_data_or_collection = _get_output_names(tool_source, tool_xml)
+        nested_discover_output_names = {
+            name
+            for name in _get_discover_output_names(tool_source, tool_xml)
+            if output_data_or_collection[name].get("type", "") in ["list:list", "list:paired"]
+        }
+        if not nested_discover_output_names:
             return
-        output_data_or_collection = _collect_output_names(tool_xml)
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
             for output in test.findall("output_collection"):
-                name = output.attrib.get("name", None)
+                name = output.get("name")
                 if not name:
                     continue
-                if name not in output_data_or_collection:
+                if name not in nested_discover_output_names:
                     continue
-
-                # - test/collection to outputs/output_collection
-                corresponding_output = output_data_or_collection[name]
-                if corresponding_output.find(".//discover_datasets") is None:
+                if output.find("./element/element") is not None or output.find("./element[@count]") is not None:
                     continue
-                if corresponding_output.get("type", "") in ["list:list", "list:paired"]:
-                    nested_elements = output.find("./element/element")
-                    element_with_count = output.find("./element[@count]")
-                    if nested_elements is None and element_with_count is None:
-                        lint_ctx.error(
-                            f"Test {test_idx}: test collection '{name}' must contain nested 'element' tags and/or element children with a 'count' attribute",
-                            linter=cls.name(),
-                            node=output,
-                        )
+                lint_ctx.error(
+                    f"Test {test_idx}: test collection '{name}' must contain nested 'element' tags and/or element children with a 'count' attribute",
+                    linter=cls.name(),
+                    node=output,
+                )
 
 
 class TestsOutputFailing(Linter):
@@ -428,13 +439,15 @@ class TestsOutputFailing(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
             return
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
-            if not asbool(test.attrib.get("expect_failure", False)):
+            if not _expect_failure(test):
                 continue
-            if test.find("output") is not None or test.find("output_collection") is not None:
+            if _has_test_outputs(test):
                 lint_ctx.error(
                     f"Test {test_idx}: Cannot specify outputs in a test expecting failure.",
                     linter=cls.name(),
@@ -448,13 +461,15 @@ class TestsExpectNumOutputsFailing(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
             return
-        tests = tool_xml.findall("./tests/test")
         for test_idx, test in enumerate(tests, start=1):
-            if not asbool(test.attrib.get("expect_failure", False)):
+            if not _expect_failure(test):
                 continue
-            if test.find("output") is not None or test.find("output_collection") is not None:
+            if _has_test_outputs(test):
                 continue
             if "expect_num_outputs" in test.attrib:
                 lint_ctx.error(
@@ -470,10 +485,14 @@ class TestsHasExpectations(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
+            return
+        tests = _get_tests(tool_source, tool_xml)
+        if not tests:
             return
-        tests = tool_xml.findall("./tests/test")
-        for test_idx, test in _iter_tests(tests, valid=False):
+        for test_idx, test, is_valid in _get_tests_validity(tool_source, tool_xml):
+            if is_valid:
+                continue
             lint_ctx.warn(
                 f"Test {test_idx}: No outputs or expectations defined for tests, this test is likely invalid.",
                 linter=cls.name(),
@@ -487,15 +506,13 @@ class TestsNoValid(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        general_node = tool_xml.find("./tests")
-        if general_node is None:
-            general_node = tool_xml.getroot()
-        tests = tool_xml.findall("./tests/test")
+        tests = _get_tests(tool_source, tool_xml)
         if not tests:
             return
-        num_valid_tests = len(list(_iter_tests(tests, valid=True)))
+        general_node = _get_tests_node(tool_source, tool_xml)
+        num_valid_tests = _count_valid_tests(tool_source, tool_xml)
         if num_valid_tests or is_datasource(tool_xml):
             lint_ctx.valid(f"{num_valid_tests} test(s) found.", linter=cls.name(), node=general_node)
 
@@ -506,33 +523,188 @@ class TestsValid(Linter):
     @classmethod
     def lint(cls, tool_source: "ToolSource", lint_ctx: "LintContext"):
         tool_xml = getattr(tool_source, "xml_tree", None)
-        if not tool_xml:
+        if tool_xml is None:
             return
-        general_node = tool_xml.find("./tests")
-        if general_node is None:
-            general_node = tool_xml.getroot()
-        tests = tool_xml.findall("./tests/test")
+        tests = _get_tests(tool_source, tool_xml)
         if not tests:
             return
-        num_valid_tests = len(list(_iter_tests(tests, valid=True)))
+        general_node = _get_tests_node(tool_source, tool_xml)
+        num_valid_tests = _count_valid_tests(tool_source, tool_xml)
         if not (num_valid_tests or is_datasource(tool_xml)):
             lint_ctx.warn("No valid test(s) found.", linter=cls.name(), node=general_node)
 
 
-def _iter_tests(tests: List["Element"], valid: bool) -> Iterator[Tuple[int, "Element"]]:
+def _iter_tests(tests: List["Element"]) -> Iterator[Tuple[int, "Element", bool]]:
+    """
+    yield (test index, test, is valid) triples, tests expecting a failure
+    that specify outputs or the number of outputs are skipped
+    """
     for test_idx, test in enumerate(tests, start=1):
         is_valid = False
-        is_valid |= bool(set(test.attrib) & {"expect_failure", "expect_exit_code", "expect_num_outputs"})
+        is_valid |= not _TEST_EXPECTATION_ATTRIBS.isdisjoint(test.attrib)
         for ta in ("assert_stdout", "assert_stderr", "assert_command"):
             if test.find(ta) is not None:
                 is_valid = True
-        found_output_test = test.find("output") is not None or test.find("output_collection") is not None
-        if asbool(test.attrib.get("expect_failure", False)):
+        found_output_test = _has_test_outputs(test)
+        if _expect_failure(test):
             if found_output_test or "expect_num_outputs" in test.attrib:
                 continue
         is_valid |= found_output_test
-        if is_valid == valid:
-            yield (test_idx, test)
+        yield (test_idx, test, is_valid)
+
+
+def _get_tests_validity(tool_source: "ToolSource", tool_xml) -> List[Tuple[int, "Element", bool]]:
+    """
+    determine the validity of the tests once, shared by TestsHasExpectations,
+    TestsNoValid, and TestsValid
+    """
+    return _cached(
+        tool_source, tool_xml, "tests_validity", lambda: list(_iter_tests(_get_tests(tool_source, tool_xml)))
+    )
+
+
+def _count_valid_tests(tool_source: "ToolSource", tool_xml) -> int:
+    return sum(1 for _, _, is_valid in _get_tests_validity(tool_source, tool_xml) if is_valid)
+
+
+def _expect_failure(test: "Element") -> bool:
+    """
+    check if a test expects a failure, same values as galaxy.util.asbool are considered true
+    """
+    return (test.get("expect_failure") or "").strip().lower() in truthy
+
+
+def _has_test_outputs(test: "Element") -> bool:
+    """
+    check if a test has output or output_collection children
+    """
+    return next(test.iterchildren("output", "output_collection"), None) is not None
+
+
+def _param_in_inputs(name: str, input_names: Set[Optional[str]], input_arguments: Set[Optional[str]]) -> bool:
+    """
+    check if a test param name corresponds to the name or the argument of an input param
+    """
+    if name in input_names:
+        return True
+    arguments = [name, f"-{name}", f"--{name}"]
+    if "_" in name:
+        dash_name = name.replace("_", "-")
+        arguments += [f"-{dash_name}", f"--{dash_name}"]
+    return any(argument in input_arguments for argument in arguments)
+
+
+def _cached(tool_source: "ToolSource", tool_xml, key: str, compute: Callable[[], Any]) -> Any:
+    """
+    memoize the result of compute on the tool source, s.t. the linters
+    of this module can share the results of their tree traversals
+
+    the cache is dropped if the tool source got a different xml tree
+    """
+    cache: Dict[str, Any]
+    cached_xml, cache = tool_source.__dict__.get("_tests_lint_cache", (None, {}))
+    if cached_xml is not tool_xml:
+        cache = {}
+        tool_source.__dict__["_tests_lint_cache"] = (tool_xml, cache)
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _get_tests(tool_source: "ToolSource", tool_xml) -> List["Element"]:
+    """
+    get the list of test elements, determined once and shared by all linters
+    """
+
+    def compute():
+        # same as findall("./tests/test") but without evaluating the path
+        root = tool_xml.getroot()
+        return [test for tests_node in root.iterchildren("tests") for test in tests_node.iterchildren("test")]
+
+    return _cached(tool_source, tool_xml, "tests", compute)
+
+
+def _get_tests_node(tool_source: "ToolSource", tool_xml) -> "Element":
+    """
+    get the tests element, or the tool element if there is none
+    """
+
+    def compute():
+        tests_node = tool_xml.find("./tests")
+        if tests_node is None:
+            tests_node = tool_xml.getroot()
+        return tests_node
+
+    return _cached(tool_source, tool_xml, "tests_node", compute)
+
+
+def _get_test_asserts(tool_source: "ToolSource", tool_xml) -> List[Tuple[int, "Element"]]:
+    """
+    determine the (test index, node) pairs for all linted assertions contained
+    in the assert_contents, assert_stdout, assert_stderr, and assert_command
+    elements of the tests
+
+    the tests are traversed once and the result is shared by all assertion linters
+    """
+
+    def compute():
+        tests = _get_tests(tool_source, tool_xml)
+        return [
+            (test_idx, a)
+            for test_idx, test in enumerate(tests, start=1)
+            for assert_node in test.iter(*_ASSERT_TAGS)
+            for a in assert_node.iterdescendants(*_LINTED_ASSERTION_TAGS)
+        ]
+
+    return _cached(tool_source, tool_xml, "test_asserts", compute)
+
+
+def _get_test_outputs(tool_source: "ToolSource", tool_xml) -> List[Tuple[int, "Element", str]]:
+    """
+    determine the (test index, node, name) triples for the named output and
+    output_collection elements of the tests
+
+    the tests are traversed once and the result is shared by the output linters
+    """
+
+    def compute():
+        tests = _get_tests(tool_source, tool_xml)
+        test_outputs = []
+        for test_idx, test in enumerate(tests, start=1):
+            for output in test.iterchildren("output", "output_collection"):
+                name = output.get("name")
+                if not name:
+                    continue
+                test_outputs.append((test_idx, output, name))
+        return test_outputs
+
+    return _cached(tool_source, tool_xml, "test_outputs", compute)
+
+
+def _get_output_names(tool_source: "ToolSource", tool_xml) -> Dict[str, "Element"]:
+    """
+    memoized variant of _collect_output_names shared by the output linters
+    """
+    return _cached(tool_source, tool_xml, "output_names", lambda: _collect_output_names(tool_xml))
+
+
+def _get_discover_output_names(tool_source: "ToolSource", tool_xml) -> Set[str]:
+    """
+    determine the names of the data and collection outputs that discover datasets
+
+    this only depends on the tool outputs, so it is determined once and
+    shared by the linters checking the tests of discovered outputs
+    """
+
+    def compute():
+        output_data_or_collection = _get_output_names(tool_source, tool_xml)
+        return {
+            name
+            for name, output in output_data_or_collection.items()
+            if output.find(".//discover_datasets") is not None
+        }
+
+    return _cached(tool_source, tool_xml, "discover_output_names", compute)
 
 
 def _collect_output_names(tool_xml):
@@ -541,10 +713,10 @@ def _collect_output_names(tool_xml):
     corresponding nodes
     """
     output_data_or_collection = {}
-    outputs = tool_xml.findall("./outputs")
+    outputs = list(tool_xml.getroot().iterchildren("outputs"))
     if len(outputs) == 1:
-        for output in list(outputs[0]):
-            name = output.attrib.get("name", None)
+        for output in outputs[0]:
+            name = output.get("name")
             if not name:
                 continue
             output_data_or_collection[name] = output
@@ -756,6 +756,20 @@ TESTS_EXPECT_FAILURE_OUTPUT = """
 </tool>
 """
 
+TESTS_EXPECT_FAILURE_OUTPUT_SPELLING = """
+<tool id="id" name="name">
+    <outputs>
+        <data name="test"/>
+    </outputs>
+    <tests>
+        <test expect_failure="tRue">
+            <output name="test"/>
+        </test>
+        <test expect_num_outputs="1" expect_failure="true "/>
+    </tests>
+</tool>
+"""
+
 ASSERTS = """
 <tool id="id" name="name">
     <outputs>
@@ -794,6 +808,23 @@ ASSERTS = """
     </tests>
 </tool>
 """
+TESTS_ASSERTS_MULTIPLE = """
+<tool id="id" name="name">
+    <tests>
+        <test>
+            <assert_stdout>
+                <has_text text="blah"/>
+            </assert_stdout>
+            <assert_stdout>
+                <has_text text="blub"/>
+            </assert_stdout>
+            <assert_stderr>
+                <has_text text="blah"/>
+            </assert_stderr>
+        </test>
+    </tests>
+</tool>
+"""
 TESTS_VALID = """
 <tool id="id" name="name">
     <outputs>
@@ -1795,6 +1826,32 @@ def test_tests_param_output_names(lint_ctx):
     assert len(lint_ctx.error_messages) == 6
 
 
+def test_tests_lint_tool_source_twice():
+    # results of the tree traversals are cached on the tool source
+    tool_source = get_xml_tool_source(TESTS_PARAM_OUTPUT_NAMES)
+    first_lint_ctx = LintContext("all", lint_message_class=XMLLintMessageLine)
+    run_lint_module(first_lint_ctx, tests, tool_source)
+    second_lint_ctx = LintContext("all", lint_message_class=XMLLintMessageLine)
+    run_lint_module(second_lint_ctx, tests, tool_source)
+    assert len(first_lint_ctx.error_messages) == 6
+    assert first_lint_ctx.error_messages == second_lint_ctx.error_messages
+    assert first_lint_ctx.valid_messages == second_lint_ctx.valid_messages
+
+
+def test_tests_lint_tool_source_replaced_xml_tree():
+    # cached results must not be reused for a different xml tree
+    tool_source = get_xml_tool_source(TESTS_PARAM_OUTPUT_NAMES)
+    first_lint_ctx = LintContext("all", lint_message_class=XMLLintMessageLine)
+    run_lint_module(first_lint_ctx, tests, tool_source)
+    assert len(first_lint_ctx.error_messages) == 6
+    tool_source.xml_tree = get_xml_tree(TESTS_VALID)
+    second_lint_ctx = LintContext("all", lint_message_class=XMLLintMessageLine)
+    run_lint_module(second_lint_ctx, tests, tool_source)
+    assert "1 test(s) found." in second_lint_ctx.valid_messages
+    assert not second_lint_ctx.warn_messages
+    assert not second_lint_ctx.error_messages
+
+
 def test_tests_expect_failure_output(lint_ctx):
     tool_source = get_xml_tool_source(TESTS_EXPECT_FAILURE_OUTPUT)
     run_lint_module(lint_ctx, tests, tool_source)
@@ -1810,6 +1867,26 @@ def test_tests_expect_failure_output(lint_ctx):
     assert len(lint_ctx.error_messages) == 2
 
 
+def test_tests_expect_failure_output_spelling(lint_ctx):
+    tool_source = get_xml_tool_source(TESTS_EXPECT_FAILURE_OUTPUT_SPELLING)
+    run_lint_module(lint_ctx, tests, tool_source)
+    # padded values are valid xs:boolean, other spellings are reported by the xsd but are still true at runtime
+    assert (
+        "Invalid XML: Element 'test', attribute 'expect_failure': 'tRue' is not a valid value of the union type 'PermissiveBoolean'."
+        in lint_ctx.error_messages
+    )
+    assert "No valid test(s) found." in lint_ctx.warn_messages
+    assert "Test 1: Cannot specify outputs in a test expecting failure." in lint_ctx.error_messages
+    assert (
+        "Test 2: Cannot make assumptions on the number of outputs in a test expecting failure."
+        in lint_ctx.error_messages
+    )
+    assert not lint_ctx.info_messages
+    assert not lint_ctx.valid_messages
+    assert len(lint_ctx.warn_messages) == 1
+    assert len(lint_ctx.error_messages) == 3
+
+
 def test_tests_without_expectations(lint_ctx):
     tool_source = get_xml_tool_source(TESTS_WO_EXPECTATIONS)
     run_lint_module(lint_ctx, tests, tool_source)
@@ -1858,6 +1935,15 @@ def test_tests_asserts(lint_ctx):
     assert len(lint_ctx.error_messages) == 9
 
 
+def test_tests_asserts_multiple(lint_ctx):
+    tool_source = get_xml_tool_source(TESTS_ASSERTS_MULTIPLE)
+    run_lint_module(lint_ctx, tests, tool_source)
+    assert "Test 1: More than one assert_stdout found. Only the first is considered." in lint_ctx.error_messages
+    assert "1 test(s) found." in lint_ctx.valid_messages
+    assert not lint_ctx.warn_messages
+    assert len(lint_ctx.error_messages) == 1
+
+
 def test_tests_output_type_mismatch(lint_ctx):
     tool_source = get_xml_tool_source(TESTS_OUTPUT_TYPE_MISMATCH)
     run_lint_module(lint_ctx, tests, tool_source)